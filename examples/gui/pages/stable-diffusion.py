@@ -11,6 +11,7 @@
 # limitations under the License.
 # ===----------------------------------------------------------------------=== #
 
+import os
 import time
 from pathlib import Path
 
@@ -19,7 +20,7 @@ import streamlit as st
 from diffusers.schedulers.scheduling_pndm import PNDMScheduler
 from max.engine import InferenceSession
 from PIL import Image
-from shared import hf_streamlit_download, menu
+from shared import hf_streamlit_download, menu, modular_cache_dir
 from transformers.models.clip.tokenization_clip import CLIPTokenizer
 
 st.set_page_config("Stable Diffusion 1.5", page_icon="🎨")
@@ -34,6 +35,64 @@ def load_tokenizer(path):
     return CLIPTokenizer.from_pretrained(path)
 
 
+@st.cache_data(show_spinner="Converting model to FP16")
+def convert_to_fp16(model_path, output_path):
+    if not os.path.exists(output_path):
+        import onnx
+        from onnxruntime.transformers.float16 import convert_float_to_float16
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        # Keep float32 inputs/outputs so the scheduler and host-side math
+        # stay in full precision. Pass the path rather than a loaded model so
+        # shape inference goes through infer_shapes_path, which handles
+        # models over protobuf's 2GB limit such as the UNet.
+        model = convert_float_to_float16(str(model_path), keep_io_types=True)
+        onnx.save(
+            model,
+            output_path,
+            save_as_external_data=True,
+            location=os.path.basename(output_path) + ".data",
+        )
+    return output_path
+
+
+# Each model is cached by its own path, so toggling a precision option only
+# recompiles the models whose path changed. Three entries hold one full set;
+# the least recently used model is evicted when a toggle loads a new one.
+@st.cache_resource(
+    show_spinner="Compiling models, faster after first run...", max_entries=3
+)
+def load_model(model_path):
+    # Need a small delay so the spinner starts correctly
+    time.sleep(1)
+    session = InferenceSession()
+    return session.load(model_path)
+
+
+@st.cache_data(show_spinner="Processing Input")
+def encode_prompts(
+    prompt, negative_prompt, tokenizer_path, text_encoder_path, _txt_encoder
+):
+    tokenizer = load_tokenizer(tokenizer_path)
+    prompt_p = tokenizer(
+        prompt, padding="max_length", max_length=tokenizer.model_max_length
+    )
+    prompt_n = tokenizer(
+        negative_prompt,
+        padding="max_length",
+        max_length=tokenizer.model_max_length,
+    )
+    input_ids = np.stack((prompt_p.input_ids, prompt_n.input_ids)).astype(
+        np.int32
+    )
+    return _txt_encoder.execute_legacy(input_ids=input_ids)["last_hidden_state"]
+
+
+@st.cache_data
+def load_scheduler_config(path):
+    return PNDMScheduler.load_config(path)
+
+
 num_steps = st.sidebar.number_input("Number of steps", 1, 100, 15)
 seed = st.sidebar.number_input("Seed", 0, 255)
 guidance_scale_factor = st.sidebar.number_input(
@@ -42,6 +101,40 @@ guidance_scale_factor = st.sidebar.number_input(
 latent_scale_factor = st.sidebar.number_input(
     "Latent Scale Factor", 0.0, 1.0, 0.18215
 )
+reuse_threshold = st.sidebar.number_input(
+    "UNet Reuse Threshold",
+    0.0,
+    1.0,
+    0.0,
+    help=(
+        "Skip the UNet and reuse the previous noise prediction while the"
+        " accumulated relative L1 change of the input stays below this value."
+        " Nonzero values trade image quality for speed; the default of 0 runs"
+        " the UNet on every step."
+    ),
+)
+skip_warmup = st.sidebar.number_input(
+    "Skip Schedule Warmup",
+    0,
+    100,
+    5,
+    help="Number of initial steps that always run the UNet.",
+)
+skip_stride = st.sidebar.number_input(
+    "Skip Schedule Stride",
+    0,
+    100,
+    0,
+    help=(
+        "After the warmup, skip the UNet on every Nth step and reuse the"
+        " previous noise prediction. Set to 0 to disable."
+    ),
+)
+half_precision = st.sidebar.checkbox(
+    "Half Precision UNet/VAE",
+    False,
+    help="Convert the UNet and VAE decoder weights to FP16.",
+)
 output_height = st.sidebar.number_input("Output Height", 0, 2048, 512)
 output_width = st.sidebar.number_input("Output Width", 0, 2048, 512)
 latent_width = output_width // 8
@@ -56,73 +149,116 @@ img_diffuser_path = model_dir / "unet" / "model.onnx"
 scheduler_path = model_dir / "scheduler" / "scheduler_config.json"
 tokenizer_path = model_dir / "tokenizer"
 
+if half_precision:
+    fp16_dir = os.path.join(modular_cache_dir(), "stable-diffusion-1.5-fp16")
+    img_decoder_path = convert_to_fp16(
+        img_decoder_path, os.path.join(fp16_dir, "vae_decoder.onnx")
+    )
+    img_diffuser_path = convert_to_fp16(
+        img_diffuser_path, os.path.join(fp16_dir, "unet.onnx")
+    )
+
 prompt = st.text_input("Prompt", "A puppy playing the drums")
 negative_prompt = st.text_input("Negative Prompt", "No overlapping geometry")
 
-if seed > 0:
-    np.random.seed(seed)
-
 if st.button("Generate Image"):
-    with st.spinner("Compiling models, faster after first run..."):
-        # Need a small delay so the spinner starts correctly
-        time.sleep(1)
-        session = InferenceSession()
-        txt_encoder = session.load(text_encoder_path)
-        img_decoder = session.load(img_decoder_path)
-        img_diffuser = session.load(img_diffuser_path)
-
-    with st.spinner("Processing Input"):
-        tokenizer = load_tokenizer(tokenizer_path)
-        prompt_p = tokenizer(
-            prompt, padding="max_length", max_length=tokenizer.model_max_length
-        )
-        prompt_n = tokenizer(
-            negative_prompt,
-            padding="max_length",
-            max_length=tokenizer.model_max_length,
-        )
-        input_ids = np.stack((prompt_p.input_ids, prompt_n.input_ids)).astype(
-            np.int32
-        )
-        encoder_hidden_states = txt_encoder.execute_legacy(input_ids=input_ids)[
-            "last_hidden_state"
-        ]
+    txt_encoder = load_model(text_encoder_path)
+    img_decoder = load_model(img_decoder_path)
+    img_diffuser = load_model(img_diffuser_path)
+
+    # Regenerating with a new seed or step count reuses the encoded prompts.
+    encoder_hidden_states = encode_prompts(
+        prompt, negative_prompt, tokenizer_path, text_encoder_path, txt_encoder
+    )
 
     with st.spinner("Initializing Latent"):
-        scheduler = PNDMScheduler.from_pretrained(scheduler_path)
+        # The scheduler is stateful, so only its config is cached.
+        scheduler = PNDMScheduler.from_config(
+            load_scheduler_config(scheduler_path)
+        )
 
-        # Note: For onnx, shapes are given in NCHW format.
-        latent = np.random.normal(
-            size=(1, latent_channels, latent_height, latent_width)
+        # Note: For onnx, shapes are given in NCHW format. ONNX Conv has no
+        # channels-last variant; MAX picks the internal conv layout when it
+        # compiles the graph, so the host-side tensors stay NCHW.
+        rng = np.random.default_rng(seed if seed > 0 else None)
+        latent = rng.standard_normal(
+            (1, latent_channels, latent_height, latent_width), dtype=np.float32
         )
-        latent = latent * scheduler.init_noise_sigma
-        latent = latent.astype(np.float32)
+        latent *= scheduler.init_noise_sigma
 
     # Loop through diffusion model.
     scheduler.set_timesteps(num_steps)
     progress_bar = st.progress(0.0, "Step 1/25")
+
+    # Fixed step-skip plan, known before the loop starts.
+    c_step = np.zeros(len(scheduler.timesteps), dtype=bool)
+    if skip_stride > 0:
+        c_step[skip_warmup::skip_stride] = True
+
+    # TeaCache-style reuse: adjacent timesteps produce highly correlated noise
+    # predictions, so skip the UNet until its input has drifted far enough.
+    prev_sample = None
+    accum_l1 = 0.0
+    cached_noise_pred = None
+
+    # Both batches share the same latent; keep one buffer across iterations
+    # instead of allocating a fresh copy every step.
+    sample_buf = np.empty(
+        (2, latent_channels, latent_height, latent_width), dtype=np.float32
+    )
+
+    # Convert all timesteps once instead of building an array every step.
+    timestep_inputs = np.asarray(scheduler.timesteps, dtype=np.int64).reshape(
+        -1, 1
+    )
     for i, t in enumerate(scheduler.timesteps):
         progress_bar.progress(i / num_steps, f"Step {i}/{num_steps}")
         if i == num_steps:
             progress_bar.progress(1.0, "Complete!")
 
-        # Duplicate input and scale based on scheduler.
-        sample = np.vstack((latent, latent))
-        sample = scheduler.scale_model_input(sample, timestep=t)
-
-        # Execute the diffusion model with bs=2. Both batches have same primary input and
-        # timestep, but the encoder_hidden_states (primary prompt vs negative) differs.
-        noise_pred = img_diffuser.execute_legacy(
-            sample=sample,
-            encoder_hidden_states=encoder_hidden_states,
-            timestep=np.array([t], dtype=np.int64),
-        )["out_sample"]
-
-        # Merge conditioned & unconditioned outputs.
-        noise_pred_text, noise_pred_uncond = np.split(noise_pred, 2)
-        noise_pred = noise_pred_uncond + guidance_scale_factor * (
-            noise_pred_text - noise_pred_uncond
-        )
+        if c_step[i] and cached_noise_pred is not None:
+            # Pass the previous prediction through the scheduler to keep its
+            # state coherent, and force the next step to run the UNet so
+            # reuse is never chained.
+            latent = scheduler.step(cached_noise_pred, t, latent).prev_sample
+            accum_l1 = float("inf")
+            continue
+
+        # Scale the single latent based on scheduler, then broadcast it into
+        # both rows of the resident buffer in one pass.
+        sample_buf[:] = scheduler.scale_model_input(latent, timestep=t)
+        sample = sample_buf
+
+        # Accumulate the relative L1 distance of the input since the last
+        # UNet call. Skipped entirely when reuse is disabled.
+        if reuse_threshold > 0:
+            if prev_sample is not None:
+                accum_l1 += np.abs(sample[0] - prev_sample).mean() / (
+                    np.abs(prev_sample).mean() + 1e-8
+                )
+            prev_sample = sample[0].copy()
+
+        if cached_noise_pred is not None and accum_l1 < reuse_threshold:
+            noise_pred = cached_noise_pred
+        else:
+            # Execute the diffusion model with bs=2. Both batches have same primary input and
+            # timestep, but the encoder_hidden_states (primary prompt vs negative) differs.
+            noise_pred = img_diffuser.execute_legacy(
+                sample=sample,
+                encoder_hidden_states=encoder_hidden_states,
+                timestep=timestep_inputs[i],
+            )["out_sample"]
+
+            # Merge conditioned & unconditioned outputs in place. A fresh
+            # output is needed each step since PNDM keeps a reference to
+            # previous model outputs.
+            noise_pred_uncond = noise_pred[1:]
+            merged = np.subtract(noise_pred[:1], noise_pred_uncond)
+            merged *= guidance_scale_factor
+            merged += noise_pred_uncond
+            noise_pred = merged
+            cached_noise_pred = noise_pred
+            accum_l1 = 0.0
 
         # Merge latent with previous iteration.
         latent = scheduler.step(noise_pred, t, latent).prev_sample
@@ -131,6 +267,10 @@ if st.button("Generate Image"):
     with st.spinner("Decoding Image"):
         latent = latent * (1 / latent_scale_factor)
         decoded = img_decoder.execute_legacy(latent_sample=latent)["sample"]
-        image = np.clip(decoded / 2 + 0.5, 0, 1).squeeze()
-        image = (image.transpose(1, 2, 0) * 255).astype(np.uint8)
+        # Map [-1, 1] to [0, 255] with a single float buffer; the extra 0.5
+        # rounds to nearest on the truncating uint8 cast.
+        image = np.multiply(decoded, 127.5)
+        np.add(image, 128.0, out=image)
+        np.clip(image, 0, 255, out=image)
+        image = image.squeeze().transpose(1, 2, 0).astype(np.uint8)
         st.image(Image.fromarray(image, "RGB"))
@@ -62,6 +62,7 @@ async def stream_text_to_console(
     if print_tokens:
         print(prompt, end="", flush=True)
 
+    eos = tokenizer.eos
     first_token = True
     while True:
         responses = pipeline.next_token(request_id_context)[0]
@@ -69,7 +70,7 @@ async def stream_text_to_console(
             break
 
         for req_id, context in request_id_context.items():
-            if req_id not in responses or context.is_done(tokenizer.eos):
+            if req_id not in responses or context.is_done(eos):
                 del request_id_context[req_id]
                 continue
 
@@ -106,28 +107,37 @@ def generate_text_for_pipeline(
         # Load tokenizer and Pipeline.
         tokenizer, pipeline = PIPELINE_REGISTRY.retrieve(pipeline_config)
 
-        # Run warmups if requested.
-        if num_warmups > 0:
-            logger.info("Running warmup...")
-            for _ in range(num_warmups):
-                asyncio.run(
-                    stream_text_to_console(
-                        pipeline,
-                        tokenizer,
-                        prompt,
-                        metrics=None,
-                        print_tokens=False,
-                    )
-                )
-
-        # Run and print results.
-        logger.info("Beginning text generation...")
+        # Run warmups and the timed generation on a single event loop.
         asyncio.run(
-            stream_text_to_console(
+            _run_generation(pipeline, tokenizer, prompt, metrics, num_warmups)
+        )
+
+
+async def _run_generation(
+    pipeline: TokenGenerator,
+    tokenizer: PipelineTokenizer,
+    prompt: str,
+    metrics: TextGenerationMetrics,
+    num_warmups: int,
+):
+    # Run warmups if requested.
+    if num_warmups > 0:
+        logger.info("Running warmup...")
+        for _ in range(num_warmups):
+            await stream_text_to_console(
                 pipeline,
                 tokenizer,
                 prompt,
-                metrics=metrics,
-                print_tokens=True,
+                metrics=None,
+                print_tokens=False,
             )
-        )
+
+    # Run and print results.
+    logger.info("Beginning text generation...")
+    await stream_text_to_console(
+        pipeline,
+        tokenizer,
+        prompt,
+        metrics=metrics,
+        print_tokens=True,
+    )
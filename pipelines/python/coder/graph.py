@@ -378,6 +378,7 @@ def transformer(
             output=output,
             theta=pipeline_config.huggingface_config.rope_theta,
             embedding=embedding_layer,
+            all_logits=pipeline_config.enable_echo,
         )
 
 
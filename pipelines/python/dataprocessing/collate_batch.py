@@ -70,25 +70,30 @@ def collate_batch(
     else:
         pad_to = math.ceil(max_len / pad_to_multiple_of) * pad_to_multiple_of
 
-    def pad(a: np.ndarray) -> np.ndarray:
-        npad = pad_to - len(a)
-        if npad == 0:
-            return a
-        padding = (npad, 0) if direction == PaddingDirection.LEFT else (0, npad)
-        return np.pad(a, padding, mode="constant", constant_values=pad_value)
-
+    num_rows = len(batch)
     if batch_size is not None:
-        pad_batch_item = np.array([pad_value] * pad_to)
-        batch.extend([pad_batch_item] * (batch_size - len(batch)))
-
-    # Generate unpadded last token index.
-    unpadded_last_token_index = (
-        np.full(len(batch), -1)
-        if direction == PaddingDirection.LEFT
-        else np.array([len(a) - 1 for a in batch])
-    )
+        num_rows = max(num_rows, batch_size)
+
+    # Write each item straight into a single pre-filled matrix rather than
+    # padding every row and stacking the copies. The output keeps the input
+    # dtype, including rows added to reach `batch_size`.
+    padded = np.full((num_rows, pad_to), pad_value, dtype=batch[0].dtype)
+    for i, a in enumerate(batch):
+        if direction == PaddingDirection.LEFT:
+            padded[i, pad_to - len(a) :] = a
+        else:
+            padded[i, : len(a)] = a
+
+    # Generate unpadded last token index. Rows added to reach `batch_size`
+    # are all padding.
+    if direction == PaddingDirection.LEFT:
+        unpadded_last_token_index = np.full(num_rows, -1)
+    else:
+        unpadded_last_token_index = np.array(
+            [len(a) - 1 for a in batch] + [pad_to - 1] * (num_rows - len(batch))
+        )
 
-    return np.stack([pad(a) for a in batch], axis=0), unpadded_last_token_index
+    return padded, unpadded_last_token_index
 
 
 def batch_padded_tokens_and_mask(
@@ -47,8 +47,17 @@ def read_number(reader, key) -> Optional[Any]:
     return field.parts[field.data[0]][0]
 
 
-def read_array(reader, key) -> Optional[List[Any]]:
+def read_array(reader, key) -> Optional[np.ndarray]:
     field = reader.get_field(key)
     if field is None:
         return None
-    return [field.parts[x][0] for x in field.data]
+    assert field.types[0] == GGUFValueType.ARRAY
+    assert field.types[-1] != GGUFValueType.STRING
+    if len(field.data) == 0:
+        return np.empty(0)
+    # Scalar array elements are stored back to back, so view the whole run
+    # in the memory-mapped file instead of collecting one part at a time.
+    first = field.parts[field.data[0]]
+    start = first.ctypes.data - reader.data.ctypes.data
+    end = start + first.itemsize * len(field.data)
+    return reader.data[start:end].view(first.dtype)
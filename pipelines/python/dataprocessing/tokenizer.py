@@ -17,6 +17,7 @@ import os
 from typing import Any, Optional, Union
 
 import gguf
+import numpy as np
 from gguf import GGUFReader, Keys
 from tokenizers import Regex, Tokenizer, decoders, pre_tokenizers, processors
 from tokenizers.models import BPE
@@ -76,10 +77,11 @@ def tokenizer_from_gguf(
         eos_token = vocab_list[eos_token_id]
         special_tokens.append(vocab_list[eos_token_id])
     token_type = gguf_utils.read_array(reader, Keys.Tokenizer.TOKEN_TYPE)
-    if token_type:
-        for i, type in enumerate(token_type):
-            if type == LlamaTokenType.LLAMA_TOKEN_TYPE_CONTROL:
-                special_tokens.append(vocab_list[i])
+    if token_type is not None:
+        control_ids = np.flatnonzero(
+            token_type == LlamaTokenType.LLAMA_TOKEN_TYPE_CONTROL
+        )
+        special_tokens.extend(vocab_list[i] for i in control_ids)
     chat_template = gguf_utils.read_string(reader, Keys.Tokenizer.CHAT_TEMPLATE)
 
     # Note: special tokens do not increase the size of the vocabulary, since
@@ -386,4 +386,5 @@ def transformer(
             output=output,
             theta=pipeline_config.huggingface_config.rope_theta,
             embedding=embedding_layer,
+            all_logits=pipeline_config.enable_echo,
         )
@@ -13,8 +13,13 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import importlib.metadata
 import logging
+import os
 import warnings
+from pathlib import Path
 from typing import Sequence
 
 import numpy as np
@@ -42,17 +47,17 @@ from nn.compute_log_probabilities import compute_log_probabilities
 
 from .gguf import transformer
 
+# Directory to cache compiled models in. Caching is disabled when unset.
+_COMPILE_CACHE_DIR_ENV = "MAX_LLAMA3_COMPILE_CACHE_DIR"
+
 
 class Llama3Model(PipelineModel):
     def execute(self, *model_inputs: Tensor) -> ModelOutputs:
         model_outputs = self.model.execute(
-            *model_inputs,
-            copy_inputs_to_device=(
-                self.pipeline_config.cache_strategy == KVCacheStrategy.NAIVE
-            ),
+            *model_inputs, copy_inputs_to_device=self._is_naive_cache
         )
 
-        if self.pipeline_config.enable_echo:
+        if self._enable_echo:
             return ModelOutputs(
                 next_token_logits=model_outputs[0],
                 logits=model_outputs[1],
@@ -99,7 +104,7 @@ class Llama3Model(PipelineModel):
         self, context_batch: Sequence[TextContext]
     ) -> tuple[Tensor, ...]:
         """Prepare the inputs for the first pass in multistep execution."""
-        if self.pipeline_config.cache_strategy == KVCacheStrategy.CONTINUOUS:
+        if self._is_continuous_cache:
             return self._prepare_continuous_initial_token_inputs(context_batch)
         else:
             return self._prepare_naive_initial_token_inputs(context_batch)
@@ -123,16 +128,36 @@ class Llama3Model(PipelineModel):
     ):
         prev_tokens, prev_attn_mask = prev_model_inputs
         batch_size = prev_tokens.shape[0]
-        start_pos = [prev_attn_mask.shape[-1]] * batch_size
-        next_tokens_batch, _, attn_mask = batch_padded_tokens_and_mask(
-            start_pos=start_pos,
-            tokens=next_tokens,
-            pad_to_multiple_of=self.pipeline_config.pad_to_multiple_of,
+        # Decode steps feed exactly one token per sequence, so write them into
+        # the preallocated int64 slot instead of padding and stacking.
+        next_tokens_batch = self._decode_tokens_buf[:batch_size]
+        next_tokens_batch[:, 0] = np.reshape(next_tokens, -1)
+        attn_mask = self._decode_attention_mask(
+            batch_size, prev_attn_mask.shape[-1] + 1
         )
         next_token_inputs = (next_tokens_batch, attn_mask)
 
         return next_token_inputs
 
+    def _decode_attention_mask(
+        self, batch_size: int, post_seq_len: int
+    ) -> np.ndarray:
+        """Returns the causal mask for a single-token decode step.
+
+        A single new token attends to the whole context, so the mask is all
+        zeros. It is served as a view into a cached buffer which only grows
+        when a larger batch or context is seen.
+        """
+        size = batch_size * post_seq_len
+        if size > self._decode_attn_mask_buf.size:
+            self._decode_attn_mask_buf = np.zeros(
+                max(size, 2 * self._decode_attn_mask_buf.size),
+                dtype=np.float32,
+            )
+        return self._decode_attn_mask_buf[:size].reshape(
+            batch_size, 1, post_seq_len
+        )
+
     def prepare_next_token_inputs(
         self,
         next_tokens: Tensor,
@@ -141,7 +166,7 @@ class Llama3Model(PipelineModel):
         """Prepare the inputs for the next token in multistep execution.
         This should avoid any device synchronization or copy operations.
         """
-        if self.pipeline_config.cache_strategy == KVCacheStrategy.CONTINUOUS:
+        if self._is_continuous_cache:
             return self._prepare_continuous_next_token_inputs(
                 next_tokens, prev_model_inputs
             )
@@ -188,6 +213,24 @@ class Llama3Model(PipelineModel):
         self,
         session: InferenceSession,
     ) -> Model:
+        # Resolve per-step config lookups once instead of on every token.
+        self._is_naive_cache = (
+            self.pipeline_config.cache_strategy == KVCacheStrategy.NAIVE
+        )
+        self._is_continuous_cache = (
+            self.pipeline_config.cache_strategy == KVCacheStrategy.CONTINUOUS
+        )
+        self._enable_echo = self.pipeline_config.enable_echo
+
+        # Token slot for single-token decode steps, matching the graph's int64
+        # tokens input.
+        self._decode_tokens_buf = np.zeros(
+            (self.pipeline_config.max_cache_batch_size, 1), dtype=np.int64
+        )
+
+        # Backing storage for decode-step attention masks, grown on demand.
+        self._decode_attn_mask_buf = np.zeros(0, dtype=np.float32)
+
         # Pre-allocate a buffer for input_row_offsets in multistep execution.
         # We do this to avoid materializing and copying a buffer with each multistep step
         self._input_row_offsets_prealloc = Tensor.from_numpy(
@@ -200,24 +243,39 @@ class Llama3Model(PipelineModel):
         self._weights = self.pipeline_config.load_weights()
 
         if serialized_path := self.pipeline_config.serialized_model_path:
-            # Hydrate all weights to be referenced by the serialized path.
-            weights_registry = {}
-            for name, tensor in self._weights._tensors.items():
-                weights_registry[name] = tensor.data
-
             logging.info("Loading serialized model from %s", serialized_path)
 
             return session.load(
-                serialized_path, weights_registry=weights_registry
+                serialized_path, weights_registry=self._weights_registry()
             )
 
         else:
-            logging.info("Building model...")
-            graph = self._build_graph(self._weights)
-            logging.info("Compiling...")
-            model = session.load(
-                graph, weights_registry=self._weights.allocated_weights
-            )
+            cache_path = self._compiled_model_cache_path()
+            model = None
+            if cache_path is not None and cache_path.exists():
+                logging.info("Loading cached model from %s", cache_path)
+                try:
+                    model = session.load(
+                        str(cache_path),
+                        weights_registry=self._weights_registry(),
+                    )
+                except Exception:
+                    logging.warning(
+                        "Failed to load cached model %s, recompiling",
+                        cache_path,
+                        exc_info=True,
+                    )
+
+            if model is None:
+                logging.info("Building model...")
+                graph = self._build_graph(self._weights)
+                logging.info("Compiling...")
+                model = session.load(
+                    graph, weights_registry=self._weights.allocated_weights
+                )
+                if cache_path is not None:
+                    _export_compiled_model(model, cache_path)
+
             if (
                 export_path
                 := self.pipeline_config.save_to_serialized_model_path
@@ -226,6 +284,55 @@ class Llama3Model(PipelineModel):
                 model._export_mef(export_path)
             return model
 
+    def _weights_registry(self) -> dict:
+        """Hydrates all weights to be referenced by a serialized model."""
+        weights_registry = {}
+        for name, tensor in self._weights._tensors.items():
+            weights_registry[name] = tensor.data
+        return weights_registry
+
+    def _compiled_model_cache_path(self) -> Path | None:
+        """Returns where to cache the compiled model, or None if disabled.
+
+        Caching is opt-in through the MAX_LLAMA3_COMPILE_CACHE_DIR environment
+        variable. The key covers everything the compiled model depends on
+        without building the graph: the MAX version, target device, model
+        config, weight layout and the source of the graph-building code.
+        """
+        cache_dir = os.environ.get(_COMPILE_CACHE_DIR_ENV)
+        if not cache_dir:
+            return None
+
+        max_version = _max_version()
+        if max_version is None:
+            logging.warning(
+                "Unable to determine the MAX version, not caching the"
+                " compiled model."
+            )
+            return None
+
+        config = self.pipeline_config
+        key = hashlib.sha256()
+        for part in (
+            max_version,
+            config.device.label,
+            config.device.id,
+            config.huggingface_config.to_json_string(),
+            config.dtype,
+            config.quantization_encoding,
+            config.cache_strategy,
+            config.enable_echo,
+            config.max_cache_batch_size,
+        ):
+            key.update(f"{part}\0".encode())
+        for name, tensor in sorted(self._weights._tensors.items()):
+            key.update(
+                f"{name}:{tensor.data.shape}:{tensor.data.dtype}\0".encode()
+            )
+        key.update(_graph_source_digest())
+
+        return Path(cache_dir) / f"{key.hexdigest()}.mef"
+
     def _build_opaque_graph(self, weights: GGUFWeights) -> Graph:
         tokens_type = TensorType(DType.int64, shape=["total_seq_len"])
         # NOTE: input_row_offsets_len should be batch_size + 1.
@@ -384,3 +491,44 @@ class Llama3Model(PipelineModel):
         return compute_log_probabilities(
             _get_logits_and_samples, batch_top_n, batch_echo
         )
+
+
+def _max_version() -> str | None:
+    """Returns the installed MAX version, if it can be determined."""
+    for distribution in ("max", "modular"):
+        try:
+            return importlib.metadata.version(distribution)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    return None
+
+
+@functools.cache
+def _graph_source_digest() -> bytes:
+    """Hashes the sources that define the Llama3 graph.
+
+    Computed once per process, so repeated model loads don't re-read them.
+    """
+    package_dir = Path(__file__).parent
+    sources = sorted(package_dir.glob("*.py")) + sorted(
+        (package_dir.parent / "nn").rglob("*.py")
+    )
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(source.read_bytes())
+    return digest.digest()
+
+
+def _export_compiled_model(model: Model, cache_path: Path) -> None:
+    """Writes `model` to `cache_path`, ignoring failures."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Export to a temporary file first so concurrent loads never observe a
+        # partially written model.
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        model._export_mef(str(tmp_path))
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        logging.warning(
+            "Failed to cache compiled model to %s", cache_path, exc_info=True
+        )
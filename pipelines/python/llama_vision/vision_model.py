@@ -122,22 +122,27 @@ class VisionModel(Layer):
         attention_mask = aspect_ratio_mask.reshape(
             (batch_size, max_num_tiles, 1, 1)
         ).cast(dtype)  # (1, 4, 1, 1)
-        # attention_shape (1, 4, 1, 1) -> (1, 4, 1032, 1)
-        attention_mask = ops.tile(attention_mask, (1, 1, target_length, 1))
 
         # Mask padding patches
         pad_patches = target_length - num_patches
 
         # The snippet below is a workaround for
         # attention_mask[:, :, 0 - pad_patches :] = 0
-        valid_mask = attention_mask[:, :, :-pad_patches, :]
-        zero_pad = ops.constant(0, dtype).broadcast_to(
-            (batch_size, max_num_tiles, pad_patches, attention_mask.shape[-1])
+        # Build the (1, 1, target_length, 1) keep/zero pattern once, so the
+        # tile, pad and inversion collapse into a single broadcasted
+        # expression instead of each materializing the expanded mask.
+        patch_pattern: tuple[TensorValue, ...] = (
+            ops.constant(1, dtype).broadcast_to((1, 1, num_patches, 1)),
         )
-        attention_mask = ops.concat((valid_mask, zero_pad), axis=2)
+        if pad_patches > 0:
+            patch_pattern += (
+                ops.constant(0, dtype).broadcast_to((1, 1, pad_patches, 1)),
+            )
+        valid_patches = ops.concat(patch_pattern, axis=2)
 
-        # Invert the mask (0 -> 1, 1 -> 0)
-        attention_mask = 1 - attention_mask
+        # Expand to target_length and invert the mask (0 -> 1, 1 -> 0).
+        # attention_shape (1, 4, 1, 1) -> (1, 4, 1032, 1)
+        attention_mask = 1 - attention_mask * valid_patches
 
         # Reshape to 2D and create 4D attention mask
         # (batch_size, 1, max_num_tiles * target_length, max_num_tiles * target_length)
@@ -148,12 +153,14 @@ class VisionModel(Layer):
         # TODO: Hardcoded for now. Reference implementation uses torch.finfo(torch.bfloat16).min
         bfloat_dtype_min_val = -3.3895313892515355e38
         # Perform outer product by broadcasting elementwise multiplication.
+        # Scale the (batch_size, max_num_tiles * target_length, 1) side first
+        # so the min value is applied once per row instead of over the full
+        # square mask.
         attention_mask = (
-            attention_mask
-            * attention_mask.reshape(
-                (batch_size, 1, max_num_tiles * target_length)
-            )
-        ) * bfloat_dtype_min_val
+            attention_mask * bfloat_dtype_min_val
+        ) * attention_mask.reshape(
+            (batch_size, 1, max_num_tiles * target_length)
+        )
 
         # before unsqueeze: attention_mask shape: (1, 4128, 4128)
         return ops.unsqueeze(attention_mask, axis=1)
@@ -178,47 +185,51 @@ class VisionModel(Layer):
         """
         left, right, top, bottom = pad
         batch_size, channels, height, width = input_tensor.shape
+        constant = ops.constant(value, dtype)
 
-        # Compute new height and width after padding
-        new_height = height + top + bottom
-        new_width = width + left + right
-
-        padded_tensor = ops.constant(value, dtype).broadcast_to(
-            (batch_size, channels, new_height, new_width)
-        )
-
-        # Insert the original tensor into the center of the padded tensor
-        # The code snippet below is a workaround for:
+        # Only materialize the padded border, one broadcasted constant per
+        # non-empty side, rather than a full padded tensor that is sliced back
+        # apart around the input.
+        # The code below is a workaround for:
         # padded_tensor[
         #     :, :, top : top + height, left : left + width
         # ] = input_tensor
+        padded_tensor = input_tensor
+
+        # Pad along width (dim=3).
+        if left > 0 or right > 0:
+            width_tuple: tuple[TensorValue, ...] = (padded_tensor,)
+            if left > 0:
+                width_tuple = (
+                    constant.broadcast_to((batch_size, channels, height, left)),
+                ) + width_tuple
+            if right > 0:
+                width_tuple += (
+                    constant.broadcast_to(
+                        (batch_size, channels, height, right)
+                    ),
+                )
+            padded_tensor = ops.concat(width_tuple, axis=3)
+
+        # Pad along height (dim=2).
+        if top > 0 or bottom > 0:
+            new_width = width + left + right
+            height_tuple: tuple[TensorValue, ...] = (padded_tensor,)
+            if top > 0:
+                height_tuple = (
+                    constant.broadcast_to(
+                        (batch_size, channels, top, new_width)
+                    ),
+                ) + height_tuple
+            if bottom > 0:
+                height_tuple += (
+                    constant.broadcast_to(
+                        (batch_size, channels, bottom, new_width)
+                    ),
+                )
+            padded_tensor = ops.concat(height_tuple, axis=2)
 
-        # Slice regions along height (dim=2)
-        # Unchanged region above
-        top_region = padded_tensor[:, :, :top, :]
-        # Unchanged region below
-        bottom_region = padded_tensor[:, :, top + height.dim :, :]
-
-        # Slice regions along width (dim=3)
-        # Unchanged region to the left
-        left_region = padded_tensor[:, :, top : top + height.dim, :left]
-        width_tuple: tuple[TensorValue, ...] = (left_region, input_tensor)
-        if left > 0:
-            # Unchanged region to the right
-            right_region = padded_tensor[
-                :, :, top : top + height.dim, left + width.dim :
-            ]
-            width_tuple += (right_region,)
-
-        # Concatenate along width (axis=3)
-        middle_region = ops.concat(width_tuple, axis=3)
-
-        # Concatenate along height (axis=2)
-        updated_padded_tensor = ops.concat(
-            (top_region, middle_region, bottom_region), axis=2
-        )
-
-        return updated_padded_tensor
+        return padded_tensor
 
     def __call__(
         self,
@@ -251,10 +262,14 @@ class VisionModel(Layer):
         # Patch embedding
         patch_embeds = self.patch_embedding(pixel_values)
 
-        # Permute it back to original dim of (4, 1280, 32, 32)
-        patch_embeds = patch_embeds.permute([0, 3, 1, 2])
-
-        hidden_state = patch_embeds.flatten(2).transpose(1, 2)
+        # The conv output is NHWC, (4, 32, 32, 1280), so the patches are
+        # already in (row, col) order with the hidden dim last. Flatten the
+        # spatial dims directly to (4, 1024, 1280) rather than permuting to
+        # NCHW and transposing back.
+        patch_batch, patch_rows, patch_cols, _ = patch_embeds.shape
+        hidden_state = patch_embeds.reshape(
+            (patch_batch, patch_rows * patch_cols, patch_embeds.shape[-1])
+        )
 
         # Tile embeddings
         _, num_patches, dim = hidden_state.shape
@@ -295,12 +310,13 @@ class VisionModel(Layer):
             num_padding_patches,
         )  # (pad_left, pad_right, pad_left for dim -2, pad_right for dim -2)
         # Pad the tensor
-        hidden_state = self._manual_constant_pad_4d(
-            dtype=self.dtype,
-            input_tensor=hidden_state,
-            pad=padding,
-            value=0,
-        )
+        if num_padding_patches > 0:
+            hidden_state = self._manual_constant_pad_4d(
+                dtype=self.dtype,
+                input_tensor=hidden_state,
+                pad=padding,
+                value=0,
+            )
 
         slice_index = -num_padding_patches if num_padding_patches > 0 else None
 
@@ -371,27 +387,25 @@ class VisionModel(Layer):
                 dim,
             )
         )
-        hidden_state = hidden_state[:, :, :slice_index]
+        if slice_index is not None:
+            hidden_state = hidden_state[:, :, :slice_index]
         hidden_state = hidden_state.reshape(
             (batch_size, num_concurrent_media, num_tiles, num_patches, dim)
         )
 
-        # Collect intermediate layer outputs from encoder output.
-        intermediate_hidden_states = ops.stack(
-            all_intermediate_hidden_states, axis=-1
-        )
-
-        # These two operations are similar to:
+        # Collect the selected intermediate layer outputs from encoder output.
+        # This is similar to:
         # `intermediate_hidden_states
-        # = intermediate_hidden_states[..., self.intermediate_layers_indices]`
-        # We don't currently support slicing based on a provided list of indices
-        # yet.
-        selected_hidden_states_list = [
-            intermediate_hidden_states[:, :, :, idx]
-            for idx in self.intermediate_layers_indices
-        ]
+        # = ops.stack(all_intermediate_hidden_states, axis=-1)[
+        #     ..., self.intermediate_layers_indices
+        # ]`
+        # but only stacks the selected layers instead of every encoder layer.
         intermediate_hidden_states = ops.stack(
-            selected_hidden_states_list, axis=-1
+            [
+                all_intermediate_hidden_states[idx]
+                for idx in self.intermediate_layers_indices
+            ],
+            axis=-1,
         )
 
         # Remove padding from intermediate hidden states.
@@ -406,9 +420,10 @@ class VisionModel(Layer):
         )
 
         # (1, 4, 1032, 6400) -> (1, 4, 1025, 6400)
-        intermediate_hidden_states = intermediate_hidden_states[
-            :, :, :slice_index
-        ]
+        if slice_index is not None:
+            intermediate_hidden_states = intermediate_hidden_states[
+                :, :, :slice_index
+            ]
 
         intermediate_hidden_states = intermediate_hidden_states.reshape(
             (
@@ -58,7 +58,7 @@ class AttentionWithRope(AttentionImpl):
         xq = xq.reshape((-1, self.n_heads, self.kv_params.head_dim))
 
         # Cast freqs_cis to xq's dtype to match the fused_qk_ragged_rope kernel.
-        freqs_cis = ops.cast(self.rope.freqs_cis, xq.dtype)
+        freqs_cis = self.rope.freqs_cis_for(xq.dtype)
 
         xq = fused_qk_ragged_rope(
             self.kv_params,
@@ -117,7 +117,7 @@ class AttentionWithRopeQKV(AttentionImplQKV):
         xq = xq.reshape((-1, self.n_heads, self.kv_params.head_dim))
 
         # Cast freqs_cis to xq's dtype to match the fused_qk_ragged_rope kernel.
-        freqs_cis = ops.cast(self.rope.freqs_cis, xq.dtype)
+        freqs_cis = self.rope.freqs_cis_for(xq.dtype)
 
         xq = fused_qk_ragged_rope(
             self.kv_params,
@@ -16,6 +16,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cached_property
 
 from max.graph import TensorValue, TensorValueLike, Weight, ops, Device
 
@@ -31,20 +32,34 @@ class Linear(Layer):
     weight: TensorValueLike
     bias: TensorValueLike | None = None
 
+    @cached_property
+    def _weight_value(self) -> TensorValue:
+        return TensorValue(self.weight)
+
+    @cached_property
+    def _weight_t(self) -> TensorValue:
+        # Transposed once per layer so repeated calls share a single node.
+        return self._weight_value.T
+
+    @cached_property
+    def _bias_value(self) -> TensorValue | None:
+        return None if self.bias is None else TensorValue(self.bias)
+
     def __call__(self, x: TensorValue) -> TensorValue:
-        weight = TensorValue(self.weight)
         if (
             isinstance(self.weight, Weight)
             and self.weight.quantization_encoding is not None
         ):
-            res = ops.qmatmul(self.weight.quantization_encoding, x, weight)
-            if self.bias is not None:
-                res += TensorValue(self.bias)
+            res = ops.qmatmul(
+                self.weight.quantization_encoding, x, self._weight_value
+            )
+            if self._bias_value is not None:
+                res += self._bias_value
             return res
 
-        res = x @ weight.T
-        if self.bias is not None:
-            res += TensorValue(self.bias)
+        res = x @ self._weight_t
+        if self._bias_value is not None:
+            res += self._bias_value
         return res
 
 
@@ -12,7 +12,7 @@
 # ===----------------------------------------------------------------------=== #
 """The rope embedding used within the model."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import cached_property
 from typing import Optional
 
@@ -39,6 +39,7 @@ class RotaryEmbedding(Layer):
     """Scaling factor for the positional frequencies."""
     _freqs_cis: Optional[TensorValueLike] = None
     interleaved: bool = True
+    _freqs_cis_by_dtype: dict[DType, TensorValue] = field(default_factory=dict)
 
     def freqs_cis_base(self) -> TensorValue:
         """
@@ -81,6 +82,12 @@ class RotaryEmbedding(Layer):
         self._freqs_cis = self.freqs_cis_base()
         return self._freqs_cis
 
+    def freqs_cis_for(self, dtype: DType) -> TensorValue:
+        """Returns `freqs_cis` cast to `dtype`, shared across callers."""
+        if dtype not in self._freqs_cis_by_dtype:
+            self._freqs_cis_by_dtype[dtype] = ops.cast(self.freqs_cis, dtype)
+        return self._freqs_cis_by_dtype[dtype]
+
     def __call__(
         self, x: TensorValueLike, start_pos: TensorValue, seq_len: Dim
     ) -> TensorValue:
@@ -15,7 +15,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from max.graph import TensorValue, TensorValueLike
+from max.graph import TensorValue, TensorValueLike, ops
 
 from ..attention import NaiveAttentionWithRope
 from ..embedding import Embedding
@@ -68,6 +68,7 @@ class NaiveTransformer(Layer):
     output: Linear
     theta: float
     embedding: Embedding
+    all_logits: bool = False
 
     def __call__(
         self,
@@ -89,4 +90,12 @@ class NaiveTransformer(Layer):
                 i,
             )
 
-        return (self.output(self.norm(h)),)
+        if self.all_logits:
+            # When echo is enabled, the logits of the input tokens are
+            # returned.
+            return (self.output(self.norm(h)),)
+
+        # Otherwise, only project the last position, keeping the sequence
+        # dimension so callers can still index `[:, -1]`.
+        last_token = ops.unsqueeze(h[:, -1], 1)
+        return (self.output(self.norm(last_token)),)
@@ -27,12 +27,6 @@ from max.pipelines import PipelineConfig, SupportedEncoding
 from max.pipelines.kv_cache import KVCacheStrategy
 
 logger = logging.getLogger(__name__)
-try:
-    import rich.traceback
-
-    rich.traceback.install()
-except ImportError:
-    pass
 
 
 class ModelGroup(click.Group):
@@ -52,6 +46,18 @@ def main():
     register_all_models()
 
 
+def install_rich_traceback():
+    # Called from the command bodies rather than the group callback: Click
+    # runs the callback before parsing the subcommand's arguments, so only
+    # the bodies are skipped by `--help` and argument errors.
+    try:
+        import rich.traceback
+
+        rich.traceback.install()
+    except ImportError:
+        pass
+
+
 def common_server_options(func):
     @click.option(
         "--profile-serve",
@@ -96,6 +102,8 @@ def cli_serve(
     model_name,
     **config_kwargs,
 ):
+    install_rich_traceback()
+
     # Initialize config, and serve.
     pipeline_config = PipelineConfig(**config_kwargs)
     serve_pipeline(
@@ -123,6 +131,8 @@ def cli_serve(
     help="# of warmup iterations to run before the final timed run.",
 )
 def cli_pipeline(prompt, num_warmups, **config_kwargs):
+    install_rich_traceback()
+
     # Load tokenizer & pipeline.
     pipeline_config = PipelineConfig(**config_kwargs)
     generate_text_for_pipeline(
@@ -172,6 +182,7 @@ def run_llama3(
     **config_kwargs,
 ):
     """Runs the Llama3 pipeline."""
+    install_rich_traceback()
 
     # Update basic parameters.
     if config_kwargs["architecture"] is None:
@@ -232,6 +243,8 @@ def replit(
     model_name,
     **config_kwargs,
 ):
+    install_rich_traceback()
+
     # Update basic parameters.
     if config_kwargs["architecture"] is None:
         config_kwargs["architecture"] = "MPTForCausalLM"
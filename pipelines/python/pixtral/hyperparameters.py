@@ -15,6 +15,7 @@
 
 from dataclasses import dataclass
 from enum import Enum
+from functools import cached_property
 from typing import Optional
 
 from max.dtype import DType
@@ -40,7 +41,7 @@ class SupportedEncodings(str, Enum):
     def __str__(self) -> str:
         return self.name
 
-    @property
+    @cached_property
     def dtype(self) -> DType:
         return _ENCODING_TO_DTYPE[self]
 
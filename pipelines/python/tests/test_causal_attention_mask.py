@@ -0,0 +1,60 @@
+# ===----------------------------------------------------------------------=== #
+# Copyright (c) 2024, Modular Inc. All rights reserved.
+#
+# Licensed under the Apache License v2.0 with LLVM Exceptions:
+# https://llvm.org/LICENSE.txt
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===----------------------------------------------------------------------=== #
+
+import math
+
+import numpy as np
+import pytest
+from dataprocessing import causal_attention_mask
+
+
+def _reference_causal_attention_mask(
+    start_pos: list[int], seq_len: list[int], pad_to_multiple_of: int = 1
+) -> np.ndarray:
+    """The triu-per-example implementation the vectorized one replaced."""
+    max_len = max(seq_len)
+    if max_len == 1:
+        padded_length = 1
+    else:
+        padded_length = (
+            math.ceil(max_len / pad_to_multiple_of) * pad_to_multiple_of
+        )
+    post_seq_len = max(start_pos) + padded_length
+    fill_matrix = np.full(
+        (padded_length, post_seq_len), -10000.0, dtype=np.float32
+    )
+    return np.stack([np.triu(fill_matrix, k=k + 1) for k in start_pos])
+
+
+@pytest.mark.parametrize(
+    "start_pos,seq_len",
+    [
+        ([0], [1]),
+        ([0], [7]),
+        ([5], [1]),
+        ([0, 0, 0], [3, 5, 2]),
+        ([0, 4, 9], [6, 1, 3]),
+        ([3, 0, 12, 7], [1, 1, 1, 1]),
+        ([17, 2], [9, 16]),
+    ],
+)
+@pytest.mark.parametrize("pad_to_multiple_of", [1, 2, 8])
+def test_causal_attention_mask_matches_reference(
+    start_pos: list[int], seq_len: list[int], pad_to_multiple_of: int
+) -> None:
+    mask = causal_attention_mask(start_pos, seq_len, pad_to_multiple_of)
+    expected = _reference_causal_attention_mask(
+        start_pos, seq_len, pad_to_multiple_of
+    )
+    assert mask.dtype == expected.dtype
+    np.testing.assert_array_equal(mask, expected)
@@ -0,0 +1,76 @@
+# ===----------------------------------------------------------------------=== #
+# Copyright (c) 2024, Modular Inc. All rights reserved.
+#
+# Licensed under the Apache License v2.0 with LLVM Exceptions:
+# https://llvm.org/LICENSE.txt
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ===----------------------------------------------------------------------=== #
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from dataprocessing import PaddingDirection, collate_batch
+
+
+def test_collate_batch_right_padding() -> None:
+    batch = [np.array([1, 2, 3]), np.array([4]), np.array([5, 6])]
+    padded, last_token_index = collate_batch(batch, pad_value=-1)
+    np.testing.assert_array_equal(padded, [[1, 2, 3], [4, -1, -1], [5, 6, -1]])
+    np.testing.assert_array_equal(last_token_index, [2, 0, 1])
+
+
+def test_collate_batch_left_padding() -> None:
+    batch = [np.array([1, 2, 3]), np.array([4]), np.array([5, 6])]
+    padded, last_token_index = collate_batch(
+        batch, direction=PaddingDirection.LEFT, pad_value=-1
+    )
+    np.testing.assert_array_equal(padded, [[1, 2, 3], [-1, -1, 4], [-1, 5, 6]])
+    np.testing.assert_array_equal(last_token_index, [-1, -1, -1])
+
+
+def test_collate_batch_pad_to_multiple_of() -> None:
+    batch = [np.array([1, 2, 3]), np.array([4, 5])]
+    padded, last_token_index = collate_batch(batch, pad_to_multiple_of=4)
+    np.testing.assert_array_equal(padded, [[1, 2, 3, 0], [4, 5, 0, 0]])
+    np.testing.assert_array_equal(last_token_index, [2, 1])
+
+
+@pytest.mark.parametrize(
+    "direction,expected_padded,expected_last_token_index",
+    [
+        (
+            PaddingDirection.RIGHT,
+            [[1, 2], [3, 0], [0, 0], [0, 0]],
+            [1, 0, 1, 1],
+        ),
+        (
+            PaddingDirection.LEFT,
+            [[1, 2], [0, 3], [0, 0], [0, 0]],
+            [-1, -1, -1, -1],
+        ),
+    ],
+)
+def test_collate_batch_batch_size_padding_rows(
+    direction: PaddingDirection,
+    expected_padded: list[list[int]],
+    expected_last_token_index: list[int],
+) -> None:
+    batch = [np.array([1, 2]), np.array([3])]
+    padded, last_token_index = collate_batch(
+        batch, direction=direction, batch_size=4
+    )
+    np.testing.assert_array_equal(padded, expected_padded)
+    np.testing.assert_array_equal(last_token_index, expected_last_token_index)
+
+
+@pytest.mark.parametrize("batch_size", [None, 3])
+def test_collate_batch_keeps_input_dtype(batch_size: int | None) -> None:
+    batch = [np.array([1, 2], dtype=np.int32), np.array([3], dtype=np.int32)]
+    padded, _ = collate_batch(batch, batch_size=batch_size)
+    assert padded.dtype == np.int32